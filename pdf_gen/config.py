@@ -6,4 +6,12 @@ class FontConfig:
     regular: str = "assets/fonts/NanumGothic.ttf"
     bold: str = "assets/fonts/NanumGothic-Bold.ttf"
     dumbledor: str = "assets/fonts/dum1.ttf"
-    title: str = "assets/fonts/ChungjuKimSaeng.ttf"
\ No newline at end of file
+    title: str = "assets/fonts/ChungjuKimSaeng.ttf"
+
+@dataclass
+class PDFConfig:
+    """General configuration for the PDF generator"""
+    # Keep ReportLab's creation timestamp and random document ID in the output
+    debug: bool = False
+    # Threads used to download icons and to decode, resize and encode them
+    image_workers: int = 16
\ No newline at end of file
@@ -0,0 +1,38 @@
+import os
+import threading
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from .config import FontConfig
+
+# Font names already registered with ReportLab in this process
+_REGISTERED: set[str] = set()
+_LOCK = threading.Lock()
+
+class FontManager:
+    """Manages font registration and configuration"""
+    def __init__(self, config: FontConfig):
+        self.config = config
+
+    def register_fonts(self) -> None:
+        """Register all required fonts"""
+        font_mappings = {
+            "NanumGothic": self.config.regular,
+            "NanumGothic-Bold": self.config.bold,
+            "Dumbledor": self.config.dumbledor,
+            "ChungjuKimSaeng": self.config.title
+        }
+
+        with _LOCK:
+            if _REGISTERED.issuperset(font_mappings):
+                return
+
+            # Fonts someone else already registered don't need to be parsed again
+            _REGISTERED.update(pdfmetrics.getRegisteredFontNames())
+            for font_name, font_path in font_mappings.items():
+                # Parsing the TTF is expensive, only do it once per process
+                if font_name in _REGISTERED:
+                    continue
+                if not os.path.exists(font_path):
+                    raise FileNotFoundError(f"Font file '{font_path}' not found.")
+                pdfmetrics.registerFont(TTFont(font_name, font_path))
+                _REGISTERED.add(font_name)
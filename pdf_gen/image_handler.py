@@ -1,68 +1,185 @@
+import os
 import logging
+import shutil
+import tempfile
 import requests
 import hashlib
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 from PIL import Image
-from io import BytesIO
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
 
 class ImageHandler:
     """Handles image processing and retrieval with local caching"""
-    def __init__(self, assets_path: str = "assets", cache_dir: str = ".cache"):
+    def __init__(
+        self,
+        assets_path: str = "assets",
+        cache_dir: str = ".cache",
+        session: Optional[requests.Session] = None,
+        max_workers: int = 16,
+    ):
         self.assets_path = Path(assets_path)
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.icons_path = self.assets_path / "icons"
+        self._icon_set = frozenset(self._list_files(self.icons_path))
+        # Names of files known to be in the cache directory, grows as files are found
+        self._cached_files = set(self._list_files(self.cache_dir))
+        # Icon id -> resolved local path, so the candidates are built once per id
+        self._local_paths: Dict[str, Optional[Path]] = {}
+        # URLs that failed to download during this run, so they are not retried
+        self._failed_urls: set[str] = set()
+        # One session for the whole run so downloads share pooled connections
+        self._owns_session = session is None
+        self.session = session or self._create_session()
+        self.max_workers = max_workers
         
+    def close(self) -> None:
+        """Release pooled connections, unless the session was injected by the caller"""
+        if self._owns_session:
+            self.session.close()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a session with a connection pool sized for parallel prefetch"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            # Only retry transient server errors, an unreachable host fails right away
+            max_retries=Retry(
+                total=2,
+                connect=0,
+                backoff_factor=0.1,
+                status_forcelist=(502, 503, 504),
+            ),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
     def _get_cache_path(self, url: str) -> Path:
         """Generate a unique cache path for a given URL"""
         # Create a unique filename using URL hash
         url_hash = hashlib.md5(url.encode()).hexdigest()
         return self.cache_dir / f"{url_hash}.png"
         
-    def get_image(self, item: Dict[str, str]) -> Optional[Image.Image]:
-        """Get image from local storage or download from URL"""
-        icon_id = item["id"]
-        
-        # First try to find in assets directory
-        path_patterns = [
-            f"icons/Icon_{icon_id}.png",
-            f"icons/Icon_{'_'.join(icon_id.split('_')[2:])}.png",
-            f"icons/Icon_{icon_id.split('_')[-1]}.png"
+    @staticmethod
+    def _list_files(directory: Path) -> list:
+        """List file names once so lookups don't hit the filesystem"""
+        try:
+            with os.scandir(directory) as entries:
+                return [entry.name for entry in entries if entry.is_file()]
+        except FileNotFoundError:
+            logger.warning("Directory not found: %s", directory)
+            return []
+
+    def _is_cached(self, cache_path: Path) -> bool:
+        """Check the cache index, falling back to the filesystem on a miss"""
+        if cache_path.name in self._cached_files:
+            return True
+        # The index is a snapshot, another process (e.g. a batch worker) may
+        # have downloaded the file since
+        if cache_path.is_file():
+            self._cached_files.add(cache_path.name)
+            return True
+        return False
+
+    def find_local_image(self, icon_id: str) -> Optional[Path]:
+        """Find the icon for the given id in the assets directory"""
+        if icon_id not in self._local_paths:
+            self._local_paths[icon_id] = self._resolve_local_image(icon_id)
+        return self._local_paths[icon_id]
+
+    def _resolve_local_image(self, icon_id: str) -> Optional[Path]:
+        """Pick the first candidate icon file name that exists"""
+        file_names = [
+            f"Icon_{icon_id}.png",
+            f"Icon_{'_'.join(icon_id.split('_')[2:])}.png",
+            f"Icon_{icon_id.split('_')[-1]}.png"
         ]
-        for pattern in path_patterns:
-            full_path = self.assets_path / pattern
-            if full_path.exists():
-                logging.info(f"Found image at: {full_path}")
-                return Image.open(full_path)
-                
+        for file_name in file_names:
+            if file_name in self._icon_set:
+                return self.icons_path / file_name
+        return None
+
+    def get_image_path(self, item: Dict[str, str]) -> Optional[Path]:
+        """Get the on-disk path of the item's image, downloading it if needed"""
+        # First try to find in assets directory
+        local_path = self.find_local_image(item["id"])
+        if local_path:
+            logger.debug("Found image at: %s", local_path)
+            return local_path
+
         # If not in assets, try to get from cache or download
         return self._download_image(item.get("image"))
-        
-    def _download_image(self, url: str) -> Optional[Image.Image]:
+
+    def prefetch(self, items: Iterable[Dict[str, str]]) -> None:
+        """Download all remote images that are missing locally in parallel"""
+        urls = {
+            item.get("image") for item in items
+            if not self.find_local_image(item["id"])
+        }
+        urls = [
+            url for url in urls
+            if url and url not in self._failed_urls
+            and not self._is_cached(self._get_cache_path(url))
+        ]
+        if not urls:
+            return
+
+        logger.info("Prefetching %d remote images", len(urls))
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            # Results land in the cache directory, get_image_path picks them up from there
+            list(executor.map(self._fetch_to_cache, urls))
+
+    def _download_image(self, url: str) -> Optional[Path]:
         """Download image from URL with caching"""
-        if not url:
+        if not url or url in self._failed_urls:
             return None
             
         # Check cache first
         cache_path = self._get_cache_path(url)
-        if cache_path.exists():
-            logging.info(f"Loading cached image from: {cache_path}")
-            return Image.open(cache_path)
+        if self._is_cached(cache_path):
+            logger.debug("Loading cached image from: %s", cache_path)
+            return cache_path
             
         # If not in cache, download and cache
+        return self._fetch_to_cache(url)
+
+    def _fetch_to_cache(self, url: str) -> Optional[Path]:
+        """Download image from URL into the cache directory"""
+        cache_path = self._get_cache_path(url)
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            image = Image.open(BytesIO(response.content))
-            
-            # Save to cache
-            image.save(cache_path)
-            logging.info(f"Cached image to: {cache_path}")
+            # Stream the body into a temp file and move it into place atomically
+            # so that concurrent or interrupted runs never leave a truncated file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f, \
+                        self.session.get(url, timeout=10, stream=True) as response:
+                    response.raise_for_status()
+                    # Let urllib3 undo any Content-Encoding while copying
+                    response.raw.decode_content = True
+                    shutil.copyfileobj(response.raw, f)
+
+                # Make sure we got an actual image before caching it
+                with Image.open(tmp_path) as image:
+                    image.verify()
+                os.replace(tmp_path, cache_path)
+                self._cached_files.add(cache_path.name)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            logger.debug("Cached image to: %s", cache_path)
             
-            return image
+            return cache_path
         except requests.RequestException as e:
-            logging.error(f"Error downloading image from {url}: {e}")
-            return None
+            logger.error("Error downloading image from %s: %s", url, e)
         except Exception as e:
-            logging.error(f"Error processing image from {url}: {e}")
-            return None
\ No newline at end of file
+            logger.error("Error processing image from %s: %s", url, e)
+        self._failed_urls.add(url)
+        return None
\ No newline at end of file
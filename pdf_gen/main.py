@@ -1,58 +1,201 @@
+import codecs
 import os
+import glob
 import json
 import logging
 import sys
 import argparse
-from .config import FontConfig
-from .pdf_generator import FontManager
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from .config import FontConfig, PDFConfig
+from .fonts import FontManager
+from .pdf_generator import PDFGenerator
 from .styles import StyleManager
 from .image_handler import ImageHandler
-from .pdf_generator import PDFGenerator
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Inputs larger than this are streamed with ijson when it is installed
+STREAMING_THRESHOLD = 512 * 1024
+
+def _is_json_array(f) -> bool:
+    """Check whether the JSON file starts with a top-level array"""
+    head = f.read(64).lstrip()
+    f.seek(0)
+    return head.startswith(b"[")
+
+def load_json(path: str) -> list:
+    """Load the input JSON as a list of items"""
+    if ijson and os.path.getsize(path) > STREAMING_THRESHOLD:
+        with open(path, "rb") as f:
+            if _is_json_array(f):
+                # Keep only what ends up in the PDF instead of materializing everything
+                return [
+                    item for item in ijson.items(f, "item", use_float=True)
+                    if isinstance(item, dict)
+                    and (item.get("id") == "_meta" or item.get("team") in PDFGenerator.VALID_TEAMS_SET)
+                ]
+
+    # Both parsers take bytes, which skips decoding through a text wrapper
+    # orjson rejects a UTF-8 BOM, strip it so both parsers accept the same files
+    raw = Path(path).read_bytes().removeprefix(codecs.BOM_UTF8)
+    data = orjson.loads(raw) if orjson else json.loads(raw)
+
+    if not isinstance(data, list):
+        data = [data]
+    return data
+
+def setup_logging() -> None:
+    """Configure logging for the CLI and its worker processes"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+def create_generator(debug: bool = False) -> PDFGenerator:
+    """Initialize the components needed to render PDFs"""
+    font_manager = FontManager(FontConfig())
+    font_manager.register_fonts()
+
+    config = PDFConfig(debug=debug)
+    style_manager = StyleManager()
+    image_handler = ImageHandler(max_workers=config.image_workers)
+    return PDFGenerator(font_manager, style_manager, image_handler, config)
+
+def default_output_filename(input_json: str) -> str:
+    """Name of the PDF written for an input when no output path is given"""
+    return f"{os.path.splitext(os.path.basename(input_json))[0]}.pdf"
+
+def convert(pdf_generator: PDFGenerator, input_json: str, output: Optional[str] = None) -> str:
+    """Render a single JSON file and return the output path"""
+    # Process input
+    data = load_json(input_json)
+
+    # Generate output filename
+    output_filename = output or default_output_filename(input_json)
+
+    # Generate PDF
+    pdf_generator.create_pdf(data, output_filename)
+    logging.info(f"PDF has been created successfully: {output_filename}")
+    return output_filename
+
+# Generator owned by each batch worker, set up once by _init_worker
+_worker_generator = None
+
+def _init_worker(debug: bool) -> None:
+    """Register fonts and build styles once per worker process"""
+    global _worker_generator
+    setup_logging()
+    _worker_generator = create_generator(debug)
+
+def _convert_in_worker(input_json: str) -> str:
+    return convert(_worker_generator, input_json)
+
+def convert_batch(input_files: list, jobs: int, debug: bool = False) -> bool:
+    """Render many JSON files in parallel, returns whether all succeeded"""
+    success = True
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(input_files)),
+        initializer=_init_worker,
+        initargs=(debug,),
+    ) as executor:
+        futures = {
+            executor.submit(_convert_in_worker, input_json): input_json
+            for input_json in input_files
+        }
+        for future, input_json in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"An error occurred while processing {input_json}: {e}")
+                success = False
+    return success
 
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
         description="Convert JSON to PDF with team filtering and sorting."
     )
-    parser.add_argument("input_json", help="Path to the input JSON file")
+    parser.add_argument(
+        "input_json",
+        nargs="+",
+        help="Paths or glob patterns of the input JSON files",
+    )
     parser.add_argument(
         "-o",
         "--output",
-        help="Path to the output PDF file (optional)",
+        help="Path to the output PDF file, only with a single input (optional)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes when converting several files",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Keep the creation timestamp and random document ID in the PDF",
     )
     
     args = parser.parse_args()
 
+    input_files = []
+    for pattern in args.input_json:
+        input_files.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    if args.output and len(input_files) > 1:
+        parser.error("--output can only be used with a single input file")
+
+    # Outputs are named after the input file only, so the same name in two
+    # directories would make one PDF silently overwrite the other
+    outputs = {}
+    for input_json in input_files:
+        outputs.setdefault(default_output_filename(input_json), []).append(input_json)
+    duplicates = [inputs for inputs in outputs.values() if len(inputs) > 1]
+    if duplicates:
+        parser.error(
+            "these inputs would write the same output file: "
+            + "; ".join(", ".join(inputs) for inputs in duplicates)
+        )
+
+    if len(input_files) > 1 and args.jobs > 1:
+        if not convert_batch(input_files, args.jobs, args.debug):
+            sys.exit(1)
+        return
+
     try:
-        # Initialize components
-        font_manager = FontManager(FontConfig())
-        font_manager.register_fonts()
-        
-        style_manager = StyleManager()
-        image_handler = ImageHandler()
-        pdf_generator = PDFGenerator(font_manager, style_manager, image_handler)
-
-        # Process input
-        with open(args.input_json, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        if not isinstance(data, list):
-            data = [data]
-
-        # Generate output filename
-        output_filename = args.output or f"{os.path.splitext(os.path.basename(args.input_json))[0]}.pdf"
-
-        # Generate PDF
-        pdf_generator.create_pdf(data, output_filename)
-        logging.info(f"PDF has been created successfully: {output_filename}")
-        
+        # One generator, and therefore one HTTP session, for every input file
+        pdf_generator = create_generator(args.debug)
     except Exception as e:
         logging.error(f"An error occurred: {e}")
         sys.exit(1)
 
+    success = True
+    try:
+        for input_json in input_files:
+            # Like convert_batch, a failing file doesn't stop the others
+            try:
+                convert(pdf_generator, input_json, args.output)
+            except Exception as e:
+                logging.error(f"An error occurred while processing {input_json}: {e}")
+                success = False
+    finally:
+        pdf_generator.image_handler.close()
+
+    if not success:
+        sys.exit(1)
+
 if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+    setup_logging()
     main()
\ No newline at end of file
@@ -1,47 +1,69 @@
 import os
+import math
+import functools
 import logging
-from typing import List, Dict
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Tuple
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Image as ReportLabImage, Table, TableStyle
+from reportlab.platypus import Flowable, SimpleDocTemplate, Paragraph, Image as ReportLabImage, Table, TableStyle
 from reportlab.lib.units import inch, mm
 from reportlab.lib.colors import HexColor
 from io import BytesIO
+from pathlib import Path
 from PIL import Image
 from .styles import StyleManager
 from .image_handler import ImageHandler
-import os
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from .config import FontConfig
-
-class FontManager:
-    """Manages font registration and configuration"""
-    def __init__(self, config: FontConfig):
-        self.config = config
-
-    def register_fonts(self) -> None:
-        """Register all required fonts"""
-        font_mappings = {
-            "NanumGothic": self.config.regular,
-            "NanumGothic-Bold": self.config.bold,
-            "Dumbledor": self.config.dumbledor,
-            "ChungjuKimSaeng": self.config.title
-        }
-
-        for font_name, font_path in font_mappings.items():
-            if not os.path.exists(font_path):
-                raise FileNotFoundError(f"Font file '{font_path}' not found.")
-            pdfmetrics.registerFont(TTFont(font_name, font_path))
+from .fonts import FontManager
+from .config import PDFConfig
+
+@functools.lru_cache(maxsize=32)
+def _white_canvas(size: Tuple[int, int]) -> Image.Image:
+    """White RGBA background reused for every icon of the same size"""
+    return Image.new('RGBA', size, (255, 255, 255, 255))
 
 class PDFGenerator:
     """Main PDF generation class"""
-    VALID_TEAMS = ["townsfolk", "outsider", "minion", "demon"]
+    # Ordered for layout, the set is for membership tests
+    VALID_TEAMS = ("townsfolk", "outsider", "minion", "demon")
+    VALID_TEAMS_SET = frozenset(VALID_TEAMS)
+    # Rendered size of character icons and the resolution they are embedded at
+    ICON_SIZE = 0.5 * inch
+    ICON_DPI = 300
+    # Smaller JPEGs are not worth the extra optimize pass
+    JPEG_OPTIMIZE_MIN_PIXELS = 128 * 128
+    # Layout of the character table: icon, name and ability columns
+    COL_WIDTHS = [0.4 * inch, 1.0 * inch, A4[0] - 2.0 * inch]
+    ROW_HEIGHT = 0.39 * inch
 
-    def __init__(self, font_manager: FontManager, style_manager: StyleManager, image_handler: ImageHandler):
+    def __init__(
+        self,
+        font_manager: FontManager,
+        style_manager: StyleManager,
+        image_handler: ImageHandler,
+        config: Optional[PDFConfig] = None,
+    ):
+        self.config = config or PDFConfig()
         self.font_manager = font_manager
         self.style_manager = style_manager
         self.image_handler = image_handler
         self.styles = style_manager.create_styles()
+        # Resolved image path -> file path or encoded JPEG bytes. Keyed by path rather
+        # than character id, since homebrew ids can point to different images per script
+        self._icon_cache: Dict[Path, str | bytes] = {}
+        # Team banner path -> display size, None when the banner is missing
+        self._banner_sizes: Dict[str, Optional[Tuple[int, int]]] = {}
+        # Base style of the character table, banner rows are styled per document
+        self._table_style = TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (0, -1), -10),
+            ("RIGHTPADDING", (-1, 0), (-1, -1), 10),
+        ])
+        # Placeholders shared by every row with missing data. Each one always sits
+        # in the same column, so its layout is identical wherever it appears
+        self._p_no_image = Paragraph("No image", self.styles["Korean"])
+        self._p_na_name = Paragraph("N/A", self.styles["KoreanName"])
+        self._p_na_ability = Paragraph("N/A", self.styles["Korean"])
 
     def create_pdf(self, data: List[Dict], output_filename: str) -> None:
         """Create PDF document from provided data"""
@@ -53,35 +75,53 @@ class PDFGenerator:
             topMargin=0*mm,
             bottomMargin=0*mm,
             compress=2,
+            # Invariant mode drops the creation timestamp and random document ID, so
+            # the same input always produces byte-identical output
+            invariant=0 if self.config.debug else 1,
         )
 
-        elements = self._process_meta_info(data)
-        elements.extend(self._process_team_data(data))
+        meta_info, grouped_data = self._partition_data(data)
+        elements = [
+            *self._process_meta_info(meta_info),
+            *self._process_team_data(grouped_data),
+        ]
         
         doc.build(elements, onFirstPage=self._add_footer, onLaterPages=self._add_footer)
 
-    def _process_meta_info(self, data: List[Dict]) -> List:
+    def _partition_data(self, data: List[Dict]) -> Tuple[Optional[Dict], Dict[str, List[Dict]]]:
+        """Find the meta information and group team members in a single pass"""
+        meta_info = None
+        grouped_data = defaultdict(list)
+        for item in data:
+            if item is None:
+                continue
+            team = item.get("team")
+            if team in self.VALID_TEAMS_SET:
+                grouped_data[team].append(item)
+            elif meta_info is None and item.get("id") == "_meta":
+                meta_info = item
+
+        return meta_info, grouped_data
+
+    def _process_meta_info(self, meta_info: Optional[Dict]) -> Iterator[Flowable]:
         """Process meta information section"""
-        elements = []
-        meta_info = next((item for item in data if item.get("id") == "_meta"), None)
-        
         if not meta_info:
             logging.warning("Meta information not found in the JSON data.")
-            return elements
+            return
 
         title = meta_info.get("name", "").upper()
         author = meta_info.get("author", "")
         
-        return self._create_meta_table(title, author)
+        yield self._create_meta_table(title, author)
 
-    def _create_meta_table(self, title: str, author: str) -> List:
+    def _create_meta_table(self, title: str, author: str) -> Table:
         """Create meta information table"""
         title_para = self.style_manager.create_mixed_font_paragraph(title, self.styles["MetaTitle"])
         left_col_width = A4[0] - 20*mm
         right_col_width = A4[0] * 0.3
 
         if not author:
-            return [Table(
+            return Table(
                 [[title_para]], 
                 colWidths=[left_col_width],
                 style=TableStyle([
@@ -89,10 +129,10 @@ class PDFGenerator:
                     ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
                     ("LEFTPADDING", (0, 0), (0, 0), 0),
                 ])
-            )]
+            )
 
         author_para = self.style_manager.create_mixed_font_paragraph(f"by {author}", self.styles["MetaAuthor"])
-        return [Table(
+        return Table(
             [[title_para, author_para]], 
             colWidths=[left_col_width - right_col_width, right_col_width],
             style=TableStyle([
@@ -102,102 +142,162 @@ class PDFGenerator:
                 ("LEFTPADDING", (0, 0), (0, 0), 0),
                 ("RIGHTPADDING", (1, 0), (1, 0), 0),
             ])
-        )]
+        )
 
-    def _process_team_data(self, data: List[Dict]) -> List:
+    def _process_team_data(self, grouped_data: Dict[str, List[Dict]]) -> Iterator[Flowable]:
         """Process team data section"""
-        elements = []
-        filtered_data = [
-            item for item in data 
-            if item is not None and item.get("team") in self.VALID_TEAMS
-        ]
-        
-        sorted_data = sorted(
-            filtered_data, 
-            key=lambda x: self.VALID_TEAMS.index(x["team"])
+        # Fetch remote icons concurrently before building the tables
+        self.image_handler.prefetch(
+            item for team_data in grouped_data.values() for item in team_data
         )
-        
-        grouped_data = {
-            team: [item for item in sorted_data if item["team"] == team]
-            for team in self.VALID_TEAMS
-        }
 
+        # All teams go into one table, each preceded by a full-width banner row
+        table_data = []
+        row_heights = []
+        banner_rows = []
+        # Iterating VALID_TEAMS keeps the team order, teams without members are skipped
         for team in self.VALID_TEAMS:
             if team in grouped_data:
-                elements.extend(self._create_team_section(team, grouped_data[team]))
+                banner, banner_height = self._create_team_banner(team)
+                banner_rows.append(len(table_data))
+                table_data.append([banner, "", ""])
+                row_heights.append(banner_height)
 
-        return elements
+                rows = self._create_team_rows(grouped_data[team])
+                table_data.extend(rows)
+                row_heights.extend([self.ROW_HEIGHT] * len(rows))
 
-    def _create_team_section(self, team: str, team_data: List[Dict]) -> List:
-        """Create section for specific team"""
-        elements = []
-        team_image_path = f"assets/images/{team}.png"
+        if not table_data:
+            return
 
-        if os.path.exists(team_image_path):
-            team_image = Image.open(team_image_path)
-            team_image.thumbnail((A4[0], 72))
-            width, height = team_image.size
-            elements.append(
-                ReportLabImage(team_image_path, width=width, height=height)
+        table = Table(
+            table_data,
+            colWidths=self.COL_WIDTHS,
+            rowHeights=row_heights,
+            style=self._table_style,
+        )
+        table.setStyle(TableStyle([
+            command for row in banner_rows for command in (
+                ("SPAN", (0, row), (-1, row)),
+                ("ALIGN", (0, row), (-1, row), "CENTER"),
+                ("LEFTPADDING", (0, row), (-1, row), 0),
+                ("RIGHTPADDING", (0, row), (-1, row), 0),
+                ("TOPPADDING", (0, row), (-1, row), 0),
+                ("BOTTOMPADDING", (0, row), (-1, row), 0),
             )
-        else:
-            logging.warning(f"Team image not found: {team_image_path}")
-            elements.append(Paragraph(team.capitalize(), self.styles["KoreanName"]))
+        ]))
+        yield table
 
-        elements.append(self._create_team_table(team_data))
-        return elements
+    def _create_team_banner(self, team: str) -> Tuple[ReportLabImage | Paragraph, Optional[float]]:
+        """Create the banner flowable for a team and the height of its row"""
+        team_image_path = f"assets/images/{team}.png"
 
-    def _create_team_table(self, team_data: List[Dict]) -> Table:
-        """Create table for team members"""
-        table_data = []
-        for item in team_data:
-            image = self._process_team_member_image(item)
-            name = Paragraph(item.get("name", "N/A"), self.styles["KoreanName"])
-            ability = Paragraph(item.get("ability", "N/A"), self.styles["Korean"])
-            table_data.append([image, name, ability])
+        banner_size = self._get_banner_size(team_image_path)
+        if banner_size:
+            width, height = banner_size
+            return ReportLabImage(team_image_path, width=width, height=height), height
 
-        return Table(
-            table_data,
-            colWidths=[0.4 * inch, 1.0 * inch, A4[0] - 2.0 * inch],
-            rowHeights=0.39 * inch,
-            style=TableStyle([
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("LEFTPADDING", (0, 0), (0, -1), -10),
-                ("RIGHTPADDING", (-1, 0), (-1, -1), 10),
-            ])
-        )
+        logging.warning(f"Team image not found: {team_image_path}")
+        # Let the table size the row to fit the paragraph
+        return Paragraph(team.capitalize(), self.styles["KoreanName"]), None
+
+    def _get_banner_size(self, team_image_path: str) -> Optional[Tuple[int, int]]:
+        """Return the display size of a team banner, None if it doesn't exist"""
+        if team_image_path not in self._banner_sizes:
+            size = None
+            if os.path.exists(team_image_path):
+                # size는 헤더에서 읽으므로 배너 전체를 디코딩하지 않음
+                with Image.open(team_image_path) as team_image:
+                    width, height = team_image.size
+                # 페이지 너비와 72pt 높이 안에 들어가도록 비율을 유지하며 축소
+                scale = min(A4[0] / width, 72 / height, 1)
+                size = (round(width * scale), round(height * scale))
+            self._banner_sizes[team_image_path] = size
+        return self._banner_sizes[team_image_path]
+
+    def _create_team_rows(self, team_data: List[Dict]) -> List[List]:
+        """Create table rows for team members"""
+        # Resolve every image first so the row assembly below does no I/O.
+        # Pillow releases the GIL while decoding and encoding, so threads overlap that work
+        with ThreadPoolExecutor(max_workers=self.config.image_workers) as executor:
+            images = list(executor.map(self._process_team_member_image, team_data))
+        name_style = self.styles["KoreanName"]
+        ability_style = self.styles["Korean"]
+
+        return [
+            [
+                image,
+                Paragraph(item["name"], name_style) if "name" in item else self._p_na_name,
+                Paragraph(item["ability"], ability_style) if "ability" in item else self._p_na_ability,
+            ]
+            for image, item in zip(images, team_data)
+        ]
 
     def _process_team_member_image(self, item: Dict) -> Paragraph | ReportLabImage:
         """Process team member image with optimization"""
-        img = self.image_handler.get_image(item)
-        if not img:
-            return Paragraph("No image", self.styles["Korean"])
+        path = self.image_handler.get_image_path(item)
+        if not path:
+            return self._p_no_image
 
-        # 이미지 크기가 실제 표시 크기보다 크다면 리사이즈
-        target_size = (int(2 * inch), int(2 * inch))
-        if img.size[0] > target_size[0] or img.size[1] > target_size[1]:
-            img = img.resize(target_size, Image.LANCZOS)
-
-        # JPEG로 변환하여 압축 (투명도가 필요없는 경우)
-        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-            # 투명 배경이 있는 경우 처리
-            background = Image.new('RGB', img.size, 'white')
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1])
-            img = background
-
-        img_byte_arr = BytesIO()
-        img.save(img_byte_arr, format='JPEG', 
-                 quality=85,  # 품질 조정 (85는 보통 시각적으로 차이가 거의 없음)
-                 optimize=True)  # 추가 최적화 활성화
+        # 같은 이미지가 여러 번 나와도 디코딩은 한 번만 함
+        if path not in self._icon_cache:
+            self._icon_cache[path] = self._load_team_member_icon(path)
+        icon = self._icon_cache[path]
 
+        # 경로는 그대로, 인코딩된 바이트는 복사 없이 BytesIO로 감싸서 전달
         return ReportLabImage(
-            BytesIO(img_byte_arr.getvalue()),
-            width=0.5 * inch,
-            height=0.5 * inch
+            icon if isinstance(icon, str) else BytesIO(icon),
+            width=self.ICON_SIZE,
+            height=self.ICON_SIZE
         )
 
+    def _load_team_member_icon(self, path: Path) -> str | bytes:
+        """Return a path ReportLab can embed as is, or the icon encoded as JPEG"""
+        target_px = math.ceil(self.ICON_SIZE / inch * self.ICON_DPI)
+        target_size = (target_px, target_px)
+
+        # 파일은 한 번만 열고, 인코딩이 끝나는 즉시 닫음
+        with Image.open(path) as img:
+            # JPEG가 이미 표시 크기 이하라면 재인코딩 없이 파일을 그대로 사용
+            # (size는 헤더에서 읽으므로 픽셀 디코딩이 일어나지 않음)
+            if self._can_embed_directly(img, target_size):
+                return str(path)
+
+            # JPEG는 픽셀을 읽기 전에 draft로 DCT 단계에서 축소 디코딩
+            if img.format == 'JPEG':
+                img.draft('RGB', target_size)
+
+            # 이미지 크기가 실제 표시 크기보다 크다면 인코딩 전에 축소 (작으면 그대로 둠)
+            img.thumbnail(target_size, Image.LANCZOS)
+
+            # JPEG로 변환하여 압축 (투명도가 필요없는 경우)
+            if img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
+                # 투명 배경이 있는 경우 미리 만들어 둔 흰 배경 위에 합성
+                img = Image.alpha_composite(_white_canvas(img.size), img.convert('RGBA')).convert('RGB')
+            elif img.mode not in ('RGB', 'L'):
+                # 팔레트, CMYK 등 JPEG로 바로 저장할 수 없는 모드
+                img = img.convert('RGB')
+
+            img_byte_arr = BytesIO()
+            img.save(img_byte_arr, format='JPEG', 
+                     quality=85,  # 품질 조정 (85는 보통 시각적으로 차이가 거의 없음)
+                     # 허프만 테이블 최적화는 인코딩을 한 번 더 하므로 큰 이미지에만 사용
+                     optimize=img.size[0] * img.size[1] > self.JPEG_OPTIMIZE_MIN_PIXELS)
+            # 중간 이미지는 여기서 버려지고, 인코딩된 바이트만 남음
+            del img
+
+        # getvalue는 내부 버퍼를 공유하므로 복사가 일어나지 않음
+        return img_byte_arr.getvalue()
+
+    @staticmethod
+    def _can_embed_directly(img: Image.Image, target_size: Tuple[int, int]) -> bool:
+        """Check whether ReportLab can embed the source file without decoding it"""
+        if img.size[0] > target_size[0] or img.size[1] > target_size[1]:
+            return False
+        # PNG는 ReportLab이 어차피 PIL로 디코딩한 뒤 Flate + SMask로 넣어 더 커지므로 제외.
+        # JPEG는 DCT 데이터를 그대로 복사하므로, 색 변환이 필요 없는 RGB/흑백만 허용
+        return img.format == 'JPEG' and img.mode in ('RGB', 'L')
+
     def _add_footer(self, canvas, doc) -> None:
         """Add footer to PDF page"""
         canvas.saveState()
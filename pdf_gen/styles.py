@@ -1,70 +1,95 @@
 import re
+import functools
 from typing import Dict
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_RIGHT
 from reportlab.lib.colors import HexColor
 from reportlab.platypus import Paragraph
 
+_HANGUL_SPLIT_RE = re.compile(r'([가-힣]+|[^가-힣]+)')
+
+_META_COLOR = HexColor("#5c1f22")
+
+# Parameters of the custom paragraph styles, colors are parsed once at import
+_CUSTOM_STYLES = (
+    dict(
+        name="Korean",
+        fontName="NanumGothic",
+        fontSize=8,
+        leading=11
+    ),
+    dict(
+        name="KoreanName",
+        fontName="NanumGothic-Bold",
+        fontSize=9,
+        leading=12
+    ),
+    dict(
+        name="MetaTitle",
+        fontName="Dumbledor",
+        fontSize=14,
+        leading=16,
+        alignment=TA_LEFT,
+        textColor=_META_COLOR
+    ),
+    dict(
+        name="MetaAuthor",
+        fontName="Dumbledor",
+        fontSize=12,
+        leading=14,
+        alignment=TA_RIGHT,
+        textColor=_META_COLOR
+    ),
+)
+
+
+def _is_hangul(part: str) -> bool:
+    """Check whether a run produced by split_korean_english is Korean"""
+    # Runs are homogeneous, so the first character decides
+    return '\uac00' <= part[0] <= '\ud7a3'
+
+
+def _split_hangul_runs(text: str) -> list:
+    """Split text into alternating Korean and non-Korean runs"""
+    # str.isascii is O(1) on CPython, English-only text skips the regex scan
+    if text.isascii():
+        return [text] if text else []
+    return _HANGUL_SPLIT_RE.findall(text)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mixed_font_markup(text: str, font_size: float) -> str:
+    """Build the <font> markup for text mixing Korean and English"""
+    hangul_tpl = f'<font face="ChungjuKimSaeng" size="{font_size - 2}">%s</font>'
+    latin_tpl = '<font face="Dumbledor">%s</font>'
+
+    return ''.join(
+        (hangul_tpl if _is_hangul(part) else latin_tpl) % part
+        for part in _split_hangul_runs(text)
+    )
+
+@functools.lru_cache(maxsize=1)
+def _build_styles() -> Dict[str, ParagraphStyle]:
+    """Build the stylesheet once per process, getSampleStyleSheet is costly"""
+    styles = getSampleStyleSheet()
+    for params in _CUSTOM_STYLES:
+        styles.add(ParagraphStyle(**params))
+    return styles
+
 class StyleManager:
     """Manages PDF styles and formatting"""
     @staticmethod
     def create_styles() -> Dict[str, ParagraphStyle]:
         """Create and return custom styles for PDF generation"""
-        styles = getSampleStyleSheet()
-        custom_styles = {
-            "Korean": ParagraphStyle(
-                name="Korean",
-                fontName="NanumGothic",
-                fontSize=8,
-                leading=11
-            ),
-            "KoreanName": ParagraphStyle(
-                name="KoreanName",
-                fontName="NanumGothic-Bold",
-                fontSize=9,
-                leading=12
-            ),
-            "MetaTitle": ParagraphStyle(
-                name="MetaTitle",
-                fontName="Dumbledor",
-                fontSize=14,
-                leading=16,
-                alignment=TA_LEFT,
-                textColor=HexColor("#5c1f22")
-            ),
-            "MetaAuthor": ParagraphStyle(
-                name="MetaAuthor",
-                fontName="Dumbledor",
-                fontSize=12,
-                leading=14,
-                alignment=TA_RIGHT,
-                textColor=HexColor("#5c1f22")
-            )
-        }
-
-        for style in custom_styles.values():
-            styles.add(style)
-        return styles
+        return _build_styles()
 
     @staticmethod
     def split_korean_english(text: str) -> list:
         """Split text into Korean and non-Korean parts"""
-        pattern = '([가-힣]+|[^가-힣]+)'
-        return re.findall(pattern, text)
+        return _split_hangul_runs(text)
 
     def create_mixed_font_paragraph(self, text: str, base_style: ParagraphStyle) -> Paragraph:
         """Create a paragraph with mixed Korean and English fonts"""
-        parts = self.split_korean_english(text)
-        formatted_text = []
-        
-        for part in parts:
-            if re.match('[가-힣]+', part):
-                formatted_text.append(
-                    f'<font face="ChungjuKimSaeng" size="{base_style.fontSize - 2}">{part}</font>'
-                )
-            else:
-                formatted_text.append(
-                    f'<font face="Dumbledor">{part}</font>'
-                )
-
-        return Paragraph(''.join(formatted_text), base_style)
\ No newline at end of file
+        # Paragraphs keep layout state, so only the markup is cached
+        formatted_text = _mixed_font_markup(text, base_style.fontSize)
+        return Paragraph(formatted_text, base_style)
\ No newline at end of file